@@ -1,127 +1,155 @@
 import asyncio
+import functools
 import logging
+import os
+import time
+from datetime import datetime
 from dotenv import load_dotenv
 from livekit.agents import (
+    NOT_GIVEN,
     Agent,
     AgentSession,
     JobContext,
+    JobProcess,
+    NotGivenOr,
     WorkerOptions,
     cli,
-    function_tool
+    function_tool,
+    tts,
+    utils
 )
 from livekit.plugins import silero, elevenlabs, groq    
 
+from energy_vad import TwoStageVAD
+from prompts import SYSTEM_PROMPT, greeting_instructions
+
 load_dotenv()
 logger = logging.getLogger("telephony-agent")
 
+# English-only Whisper distillation; set STT_MODEL=whisper-large-v3-turbo to fall back
+STT_MODEL = os.getenv("STT_MODEL", "distil-whisper-large-v3-en")
+
+# Small, fast model is enough for the 1-3 sentence replies the prompt asks for
+LLM_MODEL = os.getenv("LLM_MODEL", "llama-3.1-8b-instant")
+MAX_REPLY_TOKENS = 120
+
+# Sent with every completion to bound worst-case reply length
+LLM_COMPLETION_KWARGS = {
+    "max_completion_tokens": MAX_REPLY_TOKENS,
+    "top_p": 0.9,
+    "frequency_penalty": 0.3,
+    "stop": ["\n\n"],
+}
+
+# Patient-facing voice, with the stock ElevenLabs voice as a fallback
+TTS_VOICE_IDS = ("EKLnhHUYUAXij3rXLC74", elevenlabs.DEFAULT_VOICE_ID)
+
+# Format used by the get_current_time tool
+TIME_FMT = "%I:%M %p"
+
+# Dispatch name this worker registers under; it must match your dispatch rule
+# (the Procfile sets AGENT_NAME=telephone_agent for rooms created by app.py)
+AGENT_NAME = os.getenv("AGENT_NAME", "telephony_agent")
+
+# Seconds to wait for the SIP participant to join before giving up on the call
+PARTICIPANT_TIMEOUT = 30.0
+
+class GroqLLM(groq.LLM):
+    """groq.LLM that also sends the completion parameters the plugin doesn't expose."""
+
+    def __init__(self, *, completion_kwargs: dict, **kwargs):
+        super().__init__(**kwargs)
+        self._completion_kwargs = completion_kwargs
+
+    def chat(self, *, extra_kwargs: NotGivenOr[dict] = NOT_GIVEN, **kwargs):
+        extra = dict(self._completion_kwargs)
+        if utils.is_given(extra_kwargs):
+            extra.update(extra_kwargs)
+        return super().chat(extra_kwargs=extra, **kwargs)
+
+@functools.lru_cache(maxsize=1)
+def _time_reply(minute: int) -> str:
+    return f"The current time is {datetime.fromtimestamp(minute * 60).strftime(TIME_FMT)}"
+
 # Function tools to enhance your agent's capabilities
+# (stays async: livekit 1.2 awaits every tool's return value)
 @function_tool
 async def get_current_time() -> str:
     """Get the current time."""
-    from datetime import datetime
-    return f"The current time is {datetime.now().strftime('%I:%M %p')}"
+    # The reply only has minute resolution, so repeated calls within a minute reuse it
+    return _time_reply(int(time.time()) // 60)
+
+def prewarm(proc: JobProcess):
+    """Load models and clients once per worker process, before any call is assigned to it."""
+    # Shorter silence window ends the patient's turn sooner (plugin default is 0.4s).
+    # The energy gate keeps Silero from running on the silence between utterances.
+    proc.userdata["vad"] = TwoStageVAD(silero.VAD.load(
+        min_silence_duration=0.3,
+        min_speech_duration=0.05,
+        activation_threshold=0.3,
+    ))
+    # Streams LLM tokens over the ElevenLabs websocket; auto_mode flushes at sentence boundaries.
+    # The adapter only moves to the next voice if synthesis fails mid-call.
+    proc.userdata["tts"] = tts.FallbackAdapter([
+        elevenlabs.TTS(voice_id=voice_id, model="eleven_flash_v2_5", auto_mode=True)
+        for voice_id in TTS_VOICE_IDS
+    ])
 
 async def entrypoint(ctx: JobContext):
     """Main entry point for the telephony voice agent."""
-    await ctx.connect()
-    
-    # Wait for participant (caller) to join
-    participant = await ctx.wait_for_participant()
-    logger.info(f"Phone call connected from participant: {participant.identity}")
-    
     # Initialize the conversational agent
     agent = Agent(
-        instructions="""
-You're a warm, compassionate surgical care assistant who specializes in helping patients recover after Total Knee Arthroplasty (TKA). You’re calling to check in with the patient post-surgery.
-
-Your tone is always:
-- Supportive, friendly, and down-to-earth  
-- Conversational and human-like (using natural language like *hmm*, *umm*, *y’know*, *alrighty*, etc.)
-- Occasionally light-hearted to ease tension (a little humor goes a long way—patients are human too!)
-- Encouraging but honest—be realistic about recovery while cheering them on
-
-Your Role in the Call:
-You’re here to make the patient feel cared for and confident in their recovery. You should:
-
-- Greet the patient warmly, introduce yourself like:  
-  “Hey there, it’s Linda, your surgical care assistant. Just calling to check in—how’s that new knee treating ya?”
-
-When the patient is ready to start the call, you can start the conversation. But do not overwhelm the patient with questions.
-make sure to ask each question in less than 20-30 words.
-
-
-- Ask how they’re doing—physically and emotionally  
-- Talk with them about pain levels, swelling, sleep, and mobility  
-- Encourage them to stick with physical therapy (even when it sucks a little)  
-- Answer any questions they might have about recovery  
-- Reassure them when they feel frustrated or discouraged  
-- Remind them of small wins and progress  
-- Address concerns, and suggest when they might want to contact their surgeon or PT
-
-Communication Style:
-Keep it real—short, caring, and easy to talk to.
-
-- Use natural, human speech (don’t sound like a script or robot)  
-- Keep replies to 1–3 sentences  
-- Use a warm tone—like a good friend with medical knowledge  
-- Sprinkle in small bits of humor or kindness where it fits  
-- Use relatable metaphors or examples when explaining things  
-- Always ask follow-ups to keep the convo going:  
-  “Oh yeah? And how’s it feel when you’re standing up?” or “Gotcha—have you noticed if it gets worse after PT?”
-
-Do NOT:
-- Diagnose anything  
-- Give strict medical advice  
-- Sound overly clinical or robotic  
-
-This assistant should feel like the perfect mix of a caring nurse, a helpful buddy, and a recovery coach.
-""",
+        instructions=SYSTEM_PROMPT,
         tools=[get_current_time]
     )
     
     # Configure the voice processing pipeline optimized for telephony
     session = AgentSession(
-        # Voice Activity Detection
-        vad=silero.VAD.load(),
+        # Voice Activity Detection (loaded in prewarm)
+        vad=ctx.proc.userdata["vad"],
         
         stt=groq.STT(
-            model="whisper-large-v3-turbo",
+            model=STT_MODEL,
             language="en"
         ),
-        llm=groq.LLM(model="llama-3.3-70b-versatile", temperature=0.7),
-        tts = elevenlabs.TTS(
-            voice_id="EKLnhHUYUAXij3rXLC74",
-            model="eleven_monolingual_v1",
-        ),
+        llm=GroqLLM(model=LLM_MODEL, temperature=0.7, completion_kwargs=LLM_COMPLETION_KWARGS),
+        # Text-to-speech with voice fallback (built in prewarm)
+        tts=ctx.proc.userdata["tts"],
+        # Start the LLM on the user transcript before the end of turn is confirmed
+        preemptive_generation=True,
     )
     
-    # Start the agent session
-    await session.start(agent=agent, room=ctx.room)
+    # Connect to the room and start the agent session concurrently; they don't depend on each other
+    await asyncio.gather(
+        ctx.connect(),
+        session.start(agent=agent, room=ctx.room),
+    )
     
-    # Generate personalized greeting based on time of day
-    import datetime
-    hour = datetime.datetime.now().hour
-    if hour < 12:
-        time_greeting = "Good morning"
-    elif hour < 18:
-        time_greeting = "Good afternoon"
-    else:
-        time_greeting = "Good evening"
+    # Wait for participant (caller) to join, but don't hold the worker forever if SIP never attaches
+    try:
+        participant = await asyncio.wait_for(ctx.wait_for_participant(), timeout=PARTICIPANT_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("No participant joined room %s within %ss", ctx.room.name, PARTICIPANT_TIMEOUT)
+        ctx.shutdown(reason="participant did not join")
+        return
+    logger.info("Phone call connected from participant: %s", participant.identity)
     
+    # Generate personalized greeting based on time of day. The agent already carries
+    # SYSTEM_PROMPT; livekit appends these extra instructions after it
     await session.generate_reply(
-        instructions=f"""Say '{time_greeting}! Thank you for calling. Whats happening?'
-        Speak warmly and professionally at a moderate pace but speak slowly like a human."""
+        instructions=greeting_instructions(datetime.now().hour)
     )
 
 if __name__ == "__main__":
-    # Configure logging for better debugging
+    # Configure logging for better debugging; set LOG_LEVEL=WARNING in production
     logging.basicConfig(
-        level=logging.INFO,
+        level=os.getenv("LOG_LEVEL", "INFO"),
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
     # Run the agent with the name that matches your dispatch rule
     cli.run_app(WorkerOptions(
         entrypoint_fnc=entrypoint,
-        agent_name="telephony_agent"  # This must match your dispatch rule
+        prewarm_fnc=prewarm,
+        agent_name=AGENT_NAME  # This must match your dispatch rule
     ))
\ No newline at end of file
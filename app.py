@@ -1,19 +1,44 @@
 # app.py
 
-from flask import Flask, render_template, request, jsonify
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import HTMLResponse, ORJSONResponse
+from fastapi.templating import Jinja2Templates
 import os
 import asyncio
 import aiohttp
 import jwt
+import orjson
 import time
-import json
+import logging
+import re
+import secrets
+import threading
 from datetime import datetime, timedelta
 
 # Ensure environment variables are loaded
 from dotenv import load_dotenv
 load_dotenv()
 
-app = Flask(__name__)
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app):
+    global _pending
+    _pending = asyncio.Queue()
+    worker = asyncio.create_task(_metadata_worker())
+    yield
+    # Send what is still waiting out its delay or queued, then let the worker finish its last batch
+    _flush_scheduled_metadata()
+    _pending.put_nowait(None)
+    await worker
+    # Close the shared session (and its connection pool) on shutdown
+    if _session is not None and not _session.closed:
+        await _session.close()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+templates = Jinja2Templates(directory=os.path.join(os.path.dirname(__file__), 'templates'))
 
 # Environment variables
 LIVEKIT_URL = os.getenv('LIVEKIT_URL')
@@ -21,13 +46,88 @@ LIVEKIT_API_KEY = os.getenv('LIVEKIT_API_KEY')
 LIVEKIT_API_SECRET = os.getenv('LIVEKIT_API_SECRET')
 SIP_TRUNK_ID = os.getenv('SIP_TRUNK_ID')
 
+# Variables needed to place a call; they are read once, so this is checked once
+_MISSING_VARS = [name for name, value in [
+    ('LIVEKIT_URL', LIVEKIT_URL),
+    ('LIVEKIT_API_KEY', LIVEKIT_API_KEY),
+    ('LIVEKIT_API_SECRET', LIVEKIT_API_SECRET),
+    ('SIP_TRUNK_ID', SIP_TRUNK_ID),
+] if not value]
+_CONFIG_OK = not _MISSING_VARS
+
+# LiveKit HTTP API base URL (the server URL is usually given as ws:// or wss://)
+API_BASE = (LIVEKIT_URL or '').replace('wss://', 'https://').replace('ws://', 'http://').rstrip('/')
+
+# Twirp endpoints used by the app
+CREATE_ROOM_URL = f'{API_BASE}/twirp/livekit.RoomService/CreateRoom'
+DELETE_ROOM_URL = f'{API_BASE}/twirp/livekit.RoomService/DeleteRoom'
+UPDATE_METADATA_URL = f'{API_BASE}/twirp/livekit.RoomService/UpdateRoomMetadata'
+CREATE_SIP_URL = f'{API_BASE}/twirp/livekit.SIP/CreateSIPParticipant'
+LIST_TRUNKS_URL = f'{API_BASE}/twirp/livekit.SIP/ListSIPOutboundTrunk'
+LIST_SIP_PART_URL = f'{API_BASE}/twirp/livekit.SIP/ListSIPParticipant'
+CREATE_DISPATCH_URL = f'{API_BASE}/twirp/livekit.AgentDispatchService/CreateDispatch'
+
+# E.164: '+', a non-zero country code digit, 8-15 digits in total
+_E164 = re.compile(r'^\+[1-9]\d{7,14}$')
+# Characters dropped from a phone number to build the participant identity
+_STRIP = re.compile(r'[+\-]')
+
+TOKEN_TTL = 3600  # 1 hour expiration
+TOKEN_REFRESH_MARGIN = 60  # regenerate when less than a minute is left
+
+# Admin token shared by all requests until it is about to expire
+_token_cache = {'token': None, 'exp': 0}
+_token_lock = threading.Lock()
+
+# Grants admin access to all services; only the time claims change per token
+_STATIC_CLAIMS = {
+    'video': {
+        'room': '*',
+        'roomCreate': True,
+        'roomJoin': True,
+        'roomList': True,
+        'roomAdmin': True,
+        'canPublish': True,
+        'canSubscribe': True,
+        'canUpdateOwnMetadata': True,
+        'canPublishData': True,
+        'canSubscribeData': True
+    },
+    'sip': {
+        'call': True,
+        'admin': True
+    },
+    'agent': {
+        'dispatch': True,
+        'list': True,
+        'admin': True
+    },
+    'ingress': {
+        'create': True,
+        'update': True,
+        'list': True,
+        'delete': True,
+        'admin': True
+    },
+    'egress': {
+        'create': True,
+        'update': True,
+        'list': True,
+        'delete': True,
+        'admin': True
+    }
+}
+
+# Signs pre-serialized claims directly, skipping jwt.encode's claim validation and JSON encoding layer
+_signer = jwt.PyJWS()
+
 def generate_access_token():
     """Generate admin JWT token with all permissions"""
     if not LIVEKIT_API_KEY or not LIVEKIT_API_SECRET:
         raise ValueError("Missing LIVEKIT_API_KEY or LIVEKIT_API_SECRET")
     
     now = int(time.time())
-    exp = now + 3600  # 1 hour expiration
+    exp = now + TOKEN_TTL
     
     # More permissive payload - grants admin access to everything
     payload = {
@@ -35,144 +135,188 @@ def generate_access_token():
         'exp': exp,
         'nbf': now,
         'sub': 'admin-service',
-        # Grant admin access to all services
-        'video': {
-            'room': '*',
-            'roomCreate': True,
-            'roomJoin': True,
-            'roomList': True,
-            'roomAdmin': True,
-            'canPublish': True,
-            'canSubscribe': True,
-            'canUpdateOwnMetadata': True,
-            'canPublishData': True,
-            'canSubscribeData': True
-        },
-        'sip': {
-            'call': True,
-            'admin': True
-        },
-        'agent': {
-            'dispatch': True,
-            'list': True,
-            'admin': True
-        },
-        'ingress': {
-            'create': True,
-            'update': True,
-            'list': True,
-            'delete': True,
-            'admin': True
-        },
-        'egress': {
-            'create': True,
-            'update': True,
-            'list': True,
-            'delete': True,
-            'admin': True
-        }
+        **_STATIC_CLAIMS
     }
     
     try:
-        token = jwt.encode(payload, LIVEKIT_API_SECRET, algorithm='HS256')
+        # Same header and claims jwt.encode would produce, serialized by orjson in C
+        token = _signer.encode(orjson.dumps(payload), LIVEKIT_API_SECRET, algorithm='HS256')
         return token
     except Exception as e:
         raise ValueError(f"Failed to generate JWT: {e}")
 
+def get_access_token():
+    """Return the cached admin JWT, regenerating it shortly before it expires"""
+    if time.time() < _token_cache['exp'] - TOKEN_REFRESH_MARGIN:
+        return _token_cache['token']
+    
+    # Only one thread regenerates; the others pick up its token
+    with _token_lock:
+        if time.time() >= _token_cache['exp'] - TOKEN_REFRESH_MARGIN:
+            now = int(time.time())
+            _token_cache['token'] = generate_access_token()
+            _token_cache['exp'] = now + TOKEN_TTL
+        return _token_cache['token']
+
+# Request headers built for the current token; aiohttp copies them, so one dict can be shared
+_headers_cache = {'token': None, 'headers': None}
+
+def get_auth_headers():
+    """Return the LiveKit API request headers for the cached admin token"""
+    token = get_access_token()
+    if _headers_cache['token'] != token:
+        # Headers first, so a matching token never pairs with stale headers
+        _headers_cache['headers'] = {
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json'
+        }
+        _headers_cache['token'] = token
+    return _headers_cache['headers']
+
+# Shared aiohttp session, created on the server's event loop on first use
+_session = None
+
+# Bounds every LiveKit call instead of aiohttp's 5 minute default
+_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3, sock_connect=3, sock_read=8)
+
+def _json_dumps(obj):
+    """orjson encoder for aiohttp request bodies (aiohttp expects str)"""
+    return orjson.dumps(obj).decode()
+
+async def get_session():
+    """Return the shared aiohttp session, creating it on first use"""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=75),
+            json_serialize=_json_dumps,
+            timeout=_TIMEOUT,
+        )
+    return _session
+
+async def _post(session, url, payload, headers):
+    """POST a JSON body and return the response status and raw body"""
+    async with session.post(url, json=payload, headers=headers) as response:
+        # Read once; callers parse the bytes with orjson and only decode them for errors and debug logs
+        return response.status, await response.read()
+
+async def _delete_room(session, room_name, headers):
+    """Best-effort cleanup of a room left behind by a failed call setup"""
+    try:
+        status, raw = await _post(session, DELETE_ROOM_URL, {'room': room_name}, headers)
+    except Exception as e:
+        # A room left behind keeps a ringing SIP call attached to it, so this is worth a warning
+        logger.warning("🧹 Cleanup of room %s failed: %s", room_name, e)
+        return
+    if status != 200:
+        logger.warning("🧹 Cleanup of room %s failed: %s - %s", room_name, status, raw.decode())
+
+# Fields that are the same for every room and SIP call the app creates
+_ROOM_DEFAULTS = {
+    'empty_timeout': 300,  # 5 minutes
+    'max_participants': 10,
+}
+_SIP_DEFAULTS = {
+    'sip_trunk_id': SIP_TRUNK_ID,
+    'play_dialtone': True,
+}
+
+# Constant head of the room's agent metadata JSON, open for the per-call fields
+_ROOM_METADATA_PREFIX = orjson.dumps({
+    'agent_required': True,
+    'agent_name': 'telephone_agent',
+    'call_type': 'sip_outbound'
+}).decode()[:-1]
+
+def _build_room_data(room_name, timestamp, phone_number=None):
+    """CreateRoom body; with a phone number the room carries the agent metadata"""
+    room_data = {'name': room_name, **_ROOM_DEFAULTS}
+    if phone_number is not None:
+        # The number is JSON-encoded, since callers other than index() may pass it unvalidated
+        phone_json = orjson.dumps(phone_number).decode()
+        room_data['metadata'] = f'{_ROOM_METADATA_PREFIX},"phone_number":{phone_json},"timestamp":{timestamp}}}'
+    return room_data
+
+def _build_sip_data(phone_number, room_name, timestamp):
+    """CreateSIPParticipant body for an outbound call into the room"""
+    return {
+        **_SIP_DEFAULTS,
+        'sip_call_to': phone_number,
+        'room_name': room_name,
+        'participant_identity': f'phone-{_STRIP.sub("", phone_number)}',
+        'participant_name': f'Phone Call to {phone_number}',
+        'participant_metadata': orjson.dumps({
+            'phone_number': phone_number,
+            'call_type': 'outbound',
+            'timestamp': timestamp
+        }).decode(),
+    }
+
 async def create_room_and_call(phone_number: str):
     """Create a LiveKit room and initiate SIP call using REST API"""
     
     # Validate environment variables
-    if not all([LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET, SIP_TRUNK_ID]):
-        missing_vars = [v for v in ['LIVEKIT_URL', 'LIVEKIT_API_KEY', 'LIVEKIT_API_SECRET', 'SIP_TRUNK_ID'] if not os.getenv(v)]
-        return f"Error: Missing environment variables: {', '.join(missing_vars)}"
+    if not _CONFIG_OK:
+        return f"Error: Missing environment variables: {', '.join(_MISSING_VARS)}"
     
     try:
-        # Generate unique room name
-        timestamp = int(time.time())
-        room_name = f"surgical-call-{timestamp}"
+        # Generate unique room name (nanoseconds plus a random suffix, so concurrent calls never share one)
+        now_ns = time.time_ns()
+        timestamp = now_ns // 1_000_000_000
+        room_name = f"surgical-call-{now_ns}-{secrets.token_hex(3)}"
         
         # Generate admin token with all permissions
         try:
-            token = generate_access_token()  # Use the new admin token function
+            headers = get_auth_headers()
         except ValueError as e:
             return f"Token generation error: {e}"
         
-        # LiveKit API base URL - handle different URL formats
-        if LIVEKIT_URL.startswith('wss://'):
-            api_url = LIVEKIT_URL.replace('wss://', 'https://')
-        elif LIVEKIT_URL.startswith('ws://'):
-            api_url = LIVEKIT_URL.replace('ws://', 'http://')
-        else:
-            api_url = LIVEKIT_URL
-            
-        # Ensure no trailing slash
-        api_url = api_url.rstrip('/')
+        logger.debug("🔗 Using API URL: %s", API_BASE)
+        logger.debug("🔑 Using API Key: %s", LIVEKIT_API_KEY)
         
-        print(f"🔗 Using API URL: {api_url}")
-        print(f"🔑 Using API Key: {LIVEKIT_API_KEY}")
+        session = await get_session()
         
-        async with aiohttp.ClientSession() as session:
-            headers = {
-                'Authorization': f'Bearer {token}',
-                'Content-Type': 'application/json'
-            }
-            
-            # Step 1: Create room first with agent metadata
-            room_data = {
-                'name': room_name,
-                'empty_timeout': 300,  # 5 minutes
-                'max_participants': 10,
-                'metadata': json.dumps({
-                    'agent_required': True,
-                    'agent_name': 'telephone_agent',
-                    'call_type': 'sip_outbound',
-                    'phone_number': phone_number,
-                    'timestamp': timestamp
-                })
-            }
-            
-            print(f"🏠 Creating room: {room_name}")
-            
-            create_room_url = f'{api_url}/twirp/livekit.RoomService/CreateRoom'
-            async with session.post(create_room_url, json=room_data, headers=headers) as response:
-                response_text = await response.text()
-                print(f"📡 Room creation response: {response.status} - {response_text}")
-                
-                if response.status != 200:
-                    return f"Error creating room: {response.status} - {response_text}"
-            
-            # Step 2: Skip manual agent dispatch - let agent auto-join via room metadata
-            print(f"🤖 Room created with agent metadata - agent should auto-join")
-            
-            # Step 3: Create SIP participant (outbound call)
-            sip_data = {
-                'sip_trunk_id': SIP_TRUNK_ID,
-                'sip_call_to': phone_number,
-                'room_name': room_name,
-                'participant_identity': f'phone-{phone_number.replace("+", "").replace("-", "")}',
-                'participant_name': f'Phone Call to {phone_number}',
-                'participant_metadata': json.dumps({
-                    'phone_number': phone_number,
-                    'call_type': 'outbound',
-                    'timestamp': timestamp
-                }),
-                'play_dialtone': True,
-            }
-            
-            print(f"📞 Creating SIP call to: {phone_number}")
-            
-            sip_call_url = f'{api_url}/twirp/livekit.SIP/CreateSIPParticipant'
-            async with session.post(sip_call_url, json=sip_data, headers=headers) as response:
-                response_text = await response.text()
-                print(f"📡 SIP call response: {response.status} - {response_text}")
-                
-                if response.status == 200:
-                    result = await response.json()
-                    return f"✅ Call initiated successfully!\nRoom: {room_name}\nParticipant ID: {result.get('participant_id', 'N/A')}\n🤖 Agent should join the call shortly"
-                else:
-                    return f"Error creating SIP participant: {response.status} - {response_text}"
-                    
+        # Step 1: Room with agent metadata
+        room_data = _build_room_data(room_name, timestamp, phone_number)
+        
+        # Step 2: SIP participant (outbound call)
+        sip_data = _build_sip_data(phone_number, room_name, timestamp)
+        
+        logger.info("🏠 Creating room: %s", room_name)
+        logger.info("📞 Creating SIP call to: %s", phone_number)
+        
+        # CreateSIPParticipant attaches to the room by name, so both requests can be in flight at once
+        room_result, sip_result = await asyncio.gather(
+            _post(session, CREATE_ROOM_URL, room_data, headers),
+            _post(session, CREATE_SIP_URL, sip_data, headers),
+            return_exceptions=True,
+        )
+        
+        if isinstance(room_result, Exception) or room_result[0] != 200:
+            await _delete_room(session, room_name, headers)
+            if isinstance(room_result, Exception):
+                raise room_result
+            return f"Error creating room: {room_result[0]} - {room_result[1].decode()}"
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📡 Room creation response: %s - %s", room_result[0], room_result[1].decode())
+        
+        # Agent auto-joins via room metadata, no manual dispatch needed
+        logger.debug("🤖 Room created with agent metadata - agent should auto-join")
+        
+        if isinstance(sip_result, Exception):
+            raise sip_result
+        status, raw = sip_result
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📡 SIP call response: %s - %s", status, raw.decode())
+        
+        if status == 200:
+            result = orjson.loads(raw)
+            return f"✅ Call initiated successfully!\nRoom: {room_name}\nParticipant ID: {result.get('participant_id', 'N/A')}\n🤖 Agent should join the call shortly"
+        else:
+            return f"Error creating SIP participant: {status} - {raw.decode()}"
+        
+    except asyncio.TimeoutError:
+        return "Error: LiveKit API timed out (504) - please try again"
     except Exception as e:
         return f"Exception occurred: {str(e)}"
      
@@ -182,51 +326,39 @@ async def list_sip_trunks():
         return "Missing LiveKit credentials"
     
     try:
-        token = generate_access_token()
-        api_url = LIVEKIT_URL.replace('wss://', 'https://').replace('ws://', 'http://')
+        headers = get_auth_headers()
         
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json'
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(f'{api_url}/twirp/livekit.SIP/ListSIPOutboundTrunk', 
-                                  json={}, headers=headers) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    trunks = result.get('items', [])
-                    if trunks:
-                        trunk_info = "\n".join([f"• {trunk.get('name', 'Unnamed')} (ID: {trunk.get('sipTrunkId', 'N/A')})" 
-                                              for trunk in trunks])
-                        return f"Available SIP Trunks:\n{trunk_info}"
-                    else:
-                        return "No SIP trunks found. You need to create one first."
+        session = await get_session()
+        async with session.post(LIST_TRUNKS_URL, 
+                              json={}, headers=headers) as response:
+            if response.status == 200:
+                result = orjson.loads(await response.read())
+                trunks = result.get('items', [])
+                if trunks:
+                    trunk_info = "\n".join([f"• {trunk.get('name', 'Unnamed')} (ID: {trunk.get('sipTrunkId', 'N/A')})" 
+                                          for trunk in trunks])
+                    return f"Available SIP Trunks:\n{trunk_info}"
                 else:
-                    error_text = await response.text()
-                    return f"Error listing trunks: {response.status} - {error_text}"
-                    
+                    return "No SIP trunks found. You need to create one first."
+            else:
+                error_text = await response.text()
+                return f"Error listing trunks: {response.status} - {error_text}"
+                
     except Exception as e:
         return f"Exception: {str(e)}"
 
-@app.route('/debug/manual-dispatch')
-def manual_dispatch():
+@app.get('/debug/manual-dispatch', response_class=HTMLResponse)
+async def manual_dispatch(room_name: str = Query('test-room', alias='room')):
     """Manually dispatch agent to a room"""
-    room_name = request.args.get('room', 'test-room')
-    
     try:
         # First create a room
-        token = generate_access_token()
-        api_url = LIVEKIT_URL.replace('wss://', 'https://').replace('ws://', 'http://').rstrip('/')
-        headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
-        
-        import requests
+        headers = get_auth_headers()
+        session = await get_session()
         
         room_data = {'name': room_name}
-        room_response = requests.post(f'{api_url}/twirp/livekit.RoomService/CreateRoom', 
-                                    json=room_data, headers=headers)
-        
-        result = f"Room creation: {room_response.status_code}\n"
+        async with session.post(CREATE_ROOM_URL, 
+                                json=room_data, headers=headers) as room_response:
+            result = f"Room creation: {room_response.status}\n"
         
         # Try to manually dispatch agent
         dispatch_data = {
@@ -234,11 +366,10 @@ def manual_dispatch():
             'agent_name': 'telephone_agent'
         }
         
-        dispatch_response = requests.post(f'{api_url}/twirp/livekit.AgentDispatchService/CreateDispatch', 
-                                        json=dispatch_data, headers=headers)
-        
-        result += f"Agent dispatch: {dispatch_response.status_code}\n"
-        result += f"Response: {dispatch_response.text}\n"
+        async with session.post(CREATE_DISPATCH_URL, 
+                                json=dispatch_data, headers=headers) as dispatch_response:
+            result += f"Agent dispatch: {dispatch_response.status}\n"
+            result += f"Response: {await dispatch_response.text()}\n"
         
         return f"<pre>{result}</pre>"
         
@@ -246,138 +377,212 @@ def manual_dispatch():
         return f"<pre>Exception: {e}</pre>"
 
 
+# Seconds a call gets to establish before the agent metadata is set on its room
+METADATA_DELAY = 3
+# How long the worker waits for more updates to batch with the first one
+METADATA_BATCH_WINDOW = 0.05
+
+# (room_name, metadata) updates waiting to be sent; created by lifespan on the server's loop.
+# None tells the worker to stop once everything before it is sent.
+_pending = None
+
+# Updates still waiting out METADATA_DELAY, by room: (timer handle, metadata)
+_scheduled = {}
+
+def _schedule_metadata(room_name, metadata):
+    """Queue a room metadata update once the call has had METADATA_DELAY to establish"""
+    if _pending is None:
+        raise RuntimeError("Room metadata worker is not running (it is started by the app's lifespan)")
+    # Last write wins: a newer update for the room replaces the one still waiting
+    if (old := _scheduled.get(room_name)):
+        old[0].cancel()
+    handle = asyncio.get_running_loop().call_later(METADATA_DELAY, _enqueue_metadata, room_name)
+    _scheduled[room_name] = (handle, metadata)
+
+def _enqueue_metadata(room_name):
+    """Move a scheduled update onto the worker's queue"""
+    _, metadata = _scheduled.pop(room_name)
+    _pending.put_nowait((room_name, metadata))
+
+def _flush_scheduled_metadata():
+    """Queue every scheduled update now instead of waiting out its delay (used on shutdown)"""
+    if _scheduled:
+        logger.info("📋 Sending %d delayed room metadata update(s) early for shutdown", len(_scheduled))
+    for room_name, (handle, _) in list(_scheduled.items()):
+        handle.cancel()
+        _enqueue_metadata(room_name)
+
+async def _send_metadata(batch):
+    """Send one UpdateRoomMetadata per room in the batch, concurrently"""
+    try:
+        headers = get_auth_headers()
+        session = await get_session()
+        results = await asyncio.gather(
+            *(_post(session, UPDATE_METADATA_URL, {'room': room, 'metadata': orjson.dumps(meta).decode()}, headers)
+              for room, meta in batch.items()),
+            return_exceptions=True,
+        )
+    except Exception as e:
+        # This update is what brings the agent into the call, so failures are warnings
+        logger.warning("📋 Room metadata update failed for %s: %s", ', '.join(batch), e)
+        return
+    for room, result in zip(batch, results):
+        if isinstance(result, Exception):
+            logger.warning("📋 Room metadata update failed for %s: %s", room, result)
+        elif result[0] != 200:
+            logger.warning("📋 Room metadata update failed for %s: %s - %s", room, result[0], result[1].decode())
+        else:
+            logger.debug("📋 Room metadata updated for %s", room)
+
+async def _metadata_worker():
+    """Send queued room metadata updates, one UpdateRoomMetadata per room per batch"""
+    stopping = False
+    while not stopping:
+        item = await _pending.get()
+        if item is None:
+            break
+        await asyncio.sleep(METADATA_BATCH_WINDOW)
+        # Last write wins for a room queued more than once
+        batch = dict([item])
+        while not _pending.empty():
+            item = _pending.get_nowait()
+            if item is None:
+                stopping = True
+                break
+            batch[item[0]] = item[1]
+        await _send_metadata(batch)
+
 # Modified create_room_and_call with delay and manual agent trigger
 async def create_room_and_call_with_agent_delay(phone_number: str):
     """Create room, make SIP call, then manually add agent"""
     
-    if not all([LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET, SIP_TRUNK_ID]):
-        missing_vars = [v for v in ['LIVEKIT_URL', 'LIVEKIT_API_KEY', 'LIVEKIT_API_SECRET', 'SIP_TRUNK_ID'] if not os.getenv(v)]
-        return f"Error: Missing environment variables: {', '.join(missing_vars)}"
+    if not _CONFIG_OK:
+        return f"Error: Missing environment variables: {', '.join(_MISSING_VARS)}"
     
     try:
-        timestamp = int(time.time())
-        room_name = f"surgical-call-{timestamp}"
+        now_ns = time.time_ns()
+        timestamp = now_ns // 1_000_000_000
+        room_name = f"surgical-call-{now_ns}-{secrets.token_hex(3)}"
         
-        token = generate_access_token()
+        headers = get_auth_headers()
         
-        if LIVEKIT_URL.startswith('wss://'):
-            api_url = LIVEKIT_URL.replace('wss://', 'https://')
-        elif LIVEKIT_URL.startswith('ws://'):
-            api_url = LIVEKIT_URL.replace('ws://', 'http://')
-        else:
-            api_url = LIVEKIT_URL
-        api_url = api_url.rstrip('/')
+        session = await get_session()
         
-        async with aiohttp.ClientSession() as session:
-            headers = {
-                'Authorization': f'Bearer {token}',
-                'Content-Type': 'application/json'
-            }
-            
-            # Step 1: Create room (no agent metadata yet)
-            room_data = {
-                'name': room_name,
-                'empty_timeout': 300,
-                'max_participants': 10,
-            }
-            
-            print(f"🏠 Creating room: {room_name}")
-            create_room_url = f'{api_url}/twirp/livekit.RoomService/CreateRoom'
-            async with session.post(create_room_url, json=room_data, headers=headers) as response:
-                if response.status != 200:
-                    return f"Error creating room: {response.status} - {await response.text()}"
-            
-            # Step 2: Create SIP call
-            sip_data = {
-                'sip_trunk_id': SIP_TRUNK_ID,
-                'sip_call_to': phone_number,
-                'room_name': room_name,
-                'participant_identity': f'phone-{phone_number.replace("+", "").replace("-", "")}',
-                'participant_name': f'Phone Call to {phone_number}',
-                'participant_metadata': json.dumps({
-                    'phone_number': phone_number,
-                    'call_type': 'outbound',
-                    'timestamp': timestamp
-                }),
-                'play_dialtone': True,
-            }
-            
-            print(f"📞 Creating SIP call to: {phone_number}")
-            sip_call_url = f'{api_url}/twirp/livekit.SIP/CreateSIPParticipant'
-            async with session.post(sip_call_url, json=sip_data, headers=headers) as response:
-                if response.status != 200:
-                    return f"Error creating SIP participant: {response.status} - {await response.text()}"
+        # Step 1: Room (no agent metadata yet)
+        room_data = _build_room_data(room_name, timestamp)
+        
+        # Step 2: SIP call
+        sip_data = _build_sip_data(phone_number, room_name, timestamp)
+        
+        logger.info("🏠 Creating room: %s", room_name)
+        logger.info("📞 Creating SIP call to: %s", phone_number)
+        
+        room_result, sip_result = await asyncio.gather(
+            _post(session, CREATE_ROOM_URL, room_data, headers),
+            _post(session, CREATE_SIP_URL, sip_data, headers),
+            return_exceptions=True,
+        )
+        
+        if isinstance(room_result, Exception) or room_result[0] != 200:
+            await _delete_room(session, room_name, headers)
+            if isinstance(room_result, Exception):
+                raise room_result
+            return f"Error creating room: {room_result[0]} - {room_result[1].decode()}"
+        
+        if isinstance(sip_result, Exception):
+            raise sip_result
+        status, raw = sip_result
+        if status != 200:
+            return f"Error creating SIP participant: {status} - {raw.decode()}"
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("✅ SIP call created: %s", orjson.loads(raw).get('participant_id'))
+        
+        # Step 3: Give the call a moment to establish, then update room metadata to trigger agent
+        metadata = {
+            'agent_required': True,
+            'agent_name': 'telephone_agent',
+            'call_established': True
+        }
+        _schedule_metadata(room_name, metadata)
+        
+        return f"✅ Call initiated to {phone_number}!\nRoom: {room_name}\n🤖 Attempting to add agent..."
                 
-                sip_result = await response.json()
-                print(f"✅ SIP call created: {sip_result.get('participant_id')}")
-            
-            # Step 3: Wait a moment for call to establish, then try to add agent
-            await asyncio.sleep(3)
-            
-            # Try to update room metadata to trigger agent
-            update_data = {
-                'room': room_name,
-                'metadata': json.dumps({
-                    'agent_required': True,
-                    'agent_name': 'telephone_agent',
-                    'call_established': True
-                })
-            }
-            
-            update_url = f'{api_url}/twirp/livekit.RoomService/UpdateRoomMetadata'
-            async with session.post(update_url, json=update_data, headers=headers) as response:
-                print(f"📋 Room metadata update: {response.status}")
-            
-            return f"✅ Call initiated to {phone_number}!\nRoom: {room_name}\n🤖 Attempting to add agent..."
-                    
+    except asyncio.TimeoutError:
+        return "Error: LiveKit API timed out (504) - please try again"
     except Exception as e:
         return f"Exception occurred: {str(e)}"
     
-@app.route('/', methods=['GET', 'POST'])
-def index():
+# Seconds a finished call's result stays available from /status
+CALL_STATUS_TTL = 600
+
+# Call setup tasks by call_id; each task removes itself CALL_STATUS_TTL after it finishes.
+# This lives in process memory, so the web app runs as a single uvicorn worker (see Procfile):
+# a /status poll must reach the process that started the call.
+_calls = {}
+
+def _start_call(phone_number):
+    """Run create_room_and_call in the background and return its call_id"""
+    call_id = secrets.token_urlsafe(8)
+    task = asyncio.create_task(create_room_and_call(phone_number))
+    _calls[call_id] = task
+    task.add_done_callback(
+        lambda _: asyncio.get_running_loop().call_later(CALL_STATUS_TTL, _calls.pop, call_id, None)
+    )
+    return call_id
+
+@app.api_route('/', methods=['GET', 'POST'], response_class=HTMLResponse)
+async def index(request: Request):
     message = None
+    call_id = None
     if request.method == 'POST':
-        phone_number = request.form['phone_number']
+        form = await request.form()
+        # A missing field falls through to the format error below rather than a 500
+        phone_number = form.get('phone_number', '')
         
         # Validate phone number format
-        if not phone_number.startswith("+"):
+        if not _E164.fullmatch(phone_number):
             message = "❌ Error: Phone number must be in E.164 format (e.g., +1XXXXXXXXXX)."
         else:
-            message = asyncio.run(create_room_and_call(phone_number))
+            # Respond right away; the page polls /status/{call_id} for the outcome
+            call_id = _start_call(phone_number)
+            message = f"📞 Calling {phone_number}... (call ID: {call_id})"
     
-    return render_template('index.html', message=message)
+    return templates.TemplateResponse(request, 'index.html', {'message': message, 'call_id': call_id})
 
-@app.route('/debug/call-status/<call_id>')
-def debug_call_status(call_id):
+@app.get('/status/{call_id}')
+async def call_status(call_id: str):
+    """Outcome of a call started from the form, or pending while it is being set up"""
+    task = _calls.get(call_id)
+    if task is None:
+        return ORJSONResponse({'call_id': call_id, 'status': 'unknown'}, status_code=404)
+    if not task.done():
+        return {'call_id': call_id, 'status': 'pending'}
+    message = "Error: Call setup was cancelled" if task.cancelled() else task.result()
+    # create_room_and_call reports success with a ✅ prefix; every other outcome is an error message
+    return {'call_id': call_id, 'status': 'done', 'ok': message.startswith('✅'), 'message': message}
+
+@app.get('/debug/call-status/{call_id}', response_class=HTMLResponse)
+async def debug_call_status(call_id: str):
     """Debug endpoint to check SIP call status"""
     try:
-        token = generate_access_token()
-        api_url = LIVEKIT_URL.replace('wss://', 'https://').replace('ws://', 'http://').rstrip('/')
-        
-        import requests
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json'
-        }
+        headers = get_auth_headers()
         
         # Try to get SIP call info
-        response = requests.post(f'{api_url}/twirp/livekit.SIP/ListSIPParticipant', 
-                               json={}, headers=headers)
-        
-        if response.status_code == 200:
-            participants = response.json().get('items', [])
-            call_info = [p for p in participants if call_id in p.get('sip_call_id', '')]
-            return f"<pre>Call Status for {call_id}:\n{json.dumps(call_info, indent=2)}</pre>"
-        else:
-            return f"<pre>Error getting call status: {response.status_code} - {response.text}</pre>"
+        session = await get_session()
+        async with session.post(LIST_SIP_PART_URL, 
+                                json={}, headers=headers) as response:
+            if response.status == 200:
+                participants = orjson.loads(await response.read()).get('items', [])
+                call_info = [p for p in participants if call_id in p.get('sip_call_id', '')]
+                return f"<pre>Call Status for {call_id}:\n{orjson.dumps(call_info, option=orjson.OPT_INDENT_2).decode()}</pre>"
+            else:
+                return f"<pre>Error getting call status: {response.status} - {await response.text()}</pre>"
             
     except Exception as e:
         return f"<pre>Exception: {str(e)}</pre>"
 
-@app.route('/debug/trunk-config')
-def debug_trunk_config():
-    """Debug endpoint to show trunk configuration"""
-    config_info = f"""
+# Configuration is fixed once loaded, so the debug pages are rendered at import
+_TRUNK_CONFIG_HTML = f"""
 <h2>Current Configuration</h2>
 <pre>
 LIVEKIT_URL: {LIVEKIT_URL}
@@ -408,48 +613,47 @@ LiveKit Trunk JSON should look like:
 <li>Test a simple call from Twilio console first</li>
 </ol>
     """
-    return config_info
 
-@app.route('/debug/test-render-agent')
-def test_render_agent():
+@app.get('/debug/trunk-config', response_class=HTMLResponse)
+def debug_trunk_config():
+    """Debug endpoint to show trunk configuration"""
+    return _TRUNK_CONFIG_HTML
+
+@app.get('/debug/test-render-agent', response_class=HTMLResponse)
+async def test_render_agent():
     """Test if Render-hosted agent is working"""
     try:
-        import requests
-        
         # Test if your Render service is up
-        response = requests.get('https://surg-care.onrender.com', timeout=10)
+        session = await get_session()
+        async with session.get('https://surg-care.onrender.com',
+                               timeout=aiohttp.ClientTimeout(total=10)) as response:
+            status = response.status
         
-        if response.status_code == 200:
+        if status == 200:
             return "✅ Render agent service is running!"
         else:
-            return f"❌ Agent service returned: {response.status_code}"
+            return f"❌ Agent service returned: {status}"
             
-    except requests.exceptions.Timeout:
+    except asyncio.TimeoutError:
         return "⏱️ Agent service timeout - might be sleeping"
     except Exception as e:
         return f"❌ Error connecting to agent: {e}"
     
-@app.route('/health')
+_HEALTH_HTML = (
+    "<h2>Configuration Status</h2><ul>"
+    + "".join(
+        f"<li>{key}: {'❌' if key in _MISSING_VARS else '✅'}</li>"
+        for key in ('LIVEKIT_URL', 'LIVEKIT_API_KEY', 'LIVEKIT_API_SECRET', 'SIP_TRUNK_ID')
+    )
+    + "</ul>"
+    + ("<p>✅ All configuration looks good!</p>" if _CONFIG_OK
+       else "<p>❌ Please check your .env file for missing variables.</p>")
+)
+
+@app.get('/health', response_class=HTMLResponse)
 def health():
     """Health check endpoint"""
-    config_status = {
-        'LIVEKIT_URL': '✅' if LIVEKIT_URL else '❌',
-        'LIVEKIT_API_KEY': '✅' if LIVEKIT_API_KEY else '❌', 
-        'LIVEKIT_API_SECRET': '✅' if LIVEKIT_API_SECRET else '❌',
-        'SIP_TRUNK_ID': '✅' if SIP_TRUNK_ID else '❌'
-    }
-    
-    status_html = "<h2>Configuration Status</h2><ul>"
-    for key, status in config_status.items():
-        status_html += f"<li>{key}: {status}</li>"
-    status_html += "</ul>"
-    
-    if all(val == '✅' for val in config_status.values()):
-        status_html += "<p>✅ All configuration looks good!</p>"
-    else:
-        status_html += "<p>❌ Please check your .env file for missing variables.</p>"
-    
-    return status_html
+    return _HEALTH_HTML
 
 if __name__ == '__main__':
     # Configuration check
@@ -471,4 +675,7 @@ if __name__ == '__main__':
     print(f"🔍 Debug endpoint: http://localhost:5001/debug/trunks")
     print(f"❤️  Health check: http://localhost:5001/health")
     
-    app.run(debug=True, port=5001)
\ No newline at end of file
+    # Dev server with auto-reload; production runs the Procfile command, one uvloop worker without reload
+    # (a single process, because /status reads call state kept in this process)
+    import uvicorn
+    uvicorn.run('app:app', port=5001, reload=True, loop='uvloop', http='httptools')
\ No newline at end of file
@@ -0,0 +1,118 @@
+import asyncio
+from collections import deque
+
+import numpy as np
+from livekit import rtc
+from livekit.agents import vad
+
+
+class TwoStageVAD(vad.VAD):
+    """Energy gate in front of another VAD (Silero), so silent telephony frames skip the neural model."""
+
+    def __init__(
+        self,
+        inner: vad.VAD,
+        *,
+        gate_ratio: float = 3.0,
+        noise_alpha: float = 0.01,
+        min_noise_floor: float = 50.0,
+        reset_after: float = 1.0,
+        lead_in: float = 0.3,
+    ):
+        super().__init__(capabilities=inner.capabilities)
+        self._inner = inner
+        # Frames quieter than gate_ratio * noise floor (int16 RMS) never reach the inner VAD
+        self._gate_ratio = gate_ratio
+        self._noise_alpha = noise_alpha
+        self._min_noise_floor = min_noise_floor
+        # Seconds of gated silence after which the inner stream (and its LSTM state) is dropped
+        self._reset_after = reset_after
+        # Seconds of gated audio replayed to the inner VAD when the gate opens, so soft onsets survive
+        self._lead_in = lead_in
+
+    def stream(self) -> "TwoStageVADStream":
+        return TwoStageVADStream(self)
+
+
+def _frame_rms(frame: rtc.AudioFrame) -> float:
+    samples = np.frombuffer(frame.data, dtype=np.int16).astype(np.float32)
+    if not samples.size:
+        return 0.0
+    return float(np.sqrt(np.mean(samples * samples)))
+
+
+def _frame_duration(frame: rtc.AudioFrame) -> float:
+    return frame.samples_per_channel / frame.sample_rate
+
+
+class TwoStageVADStream(vad.VADStream):
+    def __init__(self, two_stage: TwoStageVAD):
+        self._two_stage = two_stage
+        self._speaking = False
+        super().__init__(two_stage)
+
+    async def _forward_events(self, inner: vad.VADStream) -> None:
+        async for ev in inner:
+            if ev.type == vad.VADEventType.START_OF_SPEECH:
+                self._speaking = True
+            elif ev.type == vad.VADEventType.END_OF_SPEECH:
+                self._speaking = False
+            self._event_ch.send_nowait(ev)
+
+    async def _main_task(self) -> None:
+        opts = self._two_stage
+        inner: vad.VADStream | None = None
+        forward_task: asyncio.Task | None = None
+        # Start at the minimum: the call may open on ringback or an immediate "Hello?", and
+        # seeding from the first frame would hold the gate shut until the floor decays
+        noise_floor = opts._min_noise_floor
+        gated_duration = 0.0
+        lead_in: deque[rtc.AudioFrame] = deque()
+        lead_in_duration = 0.0
+
+        try:
+            async for frame in self._input_ch:
+                if isinstance(frame, self._FlushSentinel):
+                    if inner is not None:
+                        inner.flush()
+                    continue
+
+                rms = _frame_rms(frame)
+                duration = _frame_duration(frame)
+
+                # Stage 1: below the gate and not mid-utterance, so Silero doesn't need to see it
+                if not self._speaking and rms < noise_floor * opts._gate_ratio:
+                    noise_floor = max(
+                        opts._min_noise_floor,
+                        (1 - opts._noise_alpha) * noise_floor + opts._noise_alpha * rms,
+                    )
+                    lead_in.append(frame)
+                    lead_in_duration += duration
+                    while lead_in_duration > opts._lead_in and len(lead_in) > 1:
+                        lead_in_duration -= _frame_duration(lead_in.popleft())
+
+                    gated_duration += duration
+                    if inner is not None and gated_duration >= opts._reset_after:
+                        await inner.aclose()
+                        await forward_task
+                        inner = forward_task = None
+                    continue
+
+                # Stage 2: possible speech, hand it (and the buffered lead-in) to the inner VAD
+                gated_duration = 0.0
+                if inner is None:
+                    inner = opts._inner.stream()
+                    forward_task = asyncio.create_task(self._forward_events(inner))
+                while lead_in:
+                    inner.push_frame(lead_in.popleft())
+                lead_in_duration = 0.0
+                inner.push_frame(frame)
+
+            if inner is not None:
+                inner.end_input()
+                await forward_task
+        finally:
+            if inner is not None:
+                await inner.aclose()
+            if forward_task is not None and not forward_task.done():
+                forward_task.cancel()
@@ -30,7 +30,11 @@ pip install livekit-plugins-elevenlabs>=0.6.0
 pip install livekit-plugins-silero>=0.6.0
 
 # Install web framework dependencies
-pip install flask>=3.0.0
+pip install fastapi>=0.110.0
+pip install "uvicorn[standard]>=0.29.0"
+pip install python-multipart>=0.0.9
+pip install jinja2>=3.1.0
+pip install orjson>=3.10.0
 pip install aiohttp>=3.9.0
 pip install python-dotenv>=1.0.0
 pip install PyJWT>=2.8.0
@@ -67,8 +71,8 @@ echo ""
 echo "1. Edit your .env file with actual credentials:"
 echo "   nano .env"
 echo ""
-echo "2. Test the simple agent:"
-echo "   python agent_simple.py dev"
+echo "2. Start the agent worker (set AGENT_NAME to match your dispatch rule):"
+echo "   python agent.py dev"
 echo ""
 echo "3. In another terminal, start the web interface:"
 echo "   python app.py"
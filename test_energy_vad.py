@@ -0,0 +1,69 @@
+import asyncio
+
+import numpy as np
+from livekit import rtc
+from livekit.agents import vad
+
+from energy_vad import TwoStageVAD
+
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = 160  # 10 ms
+
+
+class RecordingVAD(vad.VAD):
+    """Inner VAD that records the frames the energy gate lets through."""
+
+    def __init__(self):
+        super().__init__(capabilities=vad.VADCapabilities(update_interval=0.032))
+        self.frames = []
+
+    def stream(self) -> "RecordingVADStream":
+        return RecordingVADStream(self)
+
+
+class RecordingVADStream(vad.VADStream):
+    async def _main_task(self) -> None:
+        async for frame in self._input_ch:
+            if isinstance(frame, rtc.AudioFrame):
+                self._vad.frames.append(frame)
+
+
+def _frame(amplitude: float, seed: int = 0) -> rtc.AudioFrame:
+    rng = np.random.default_rng(seed)
+    samples = (rng.standard_normal(FRAME_SAMPLES) * amplitude).astype(np.int16)
+    return rtc.AudioFrame(samples.tobytes(), SAMPLE_RATE, 1, FRAME_SAMPLES)
+
+
+def _run(frames: list[rtc.AudioFrame]) -> RecordingVAD:
+    inner = RecordingVAD()
+
+    async def main():
+        stream = TwoStageVAD(inner).stream()
+        for frame in frames:
+            stream.push_frame(frame)
+        stream.end_input()
+        async for _ in stream:
+            pass
+
+    asyncio.run(main())
+    return inner
+
+
+def test_loud_first_frames_reach_inner_vad():
+    # The call opens on speech (or ringback); it must not become the noise floor
+    loud = [_frame(2000, seed=i) for i in range(50)]
+    inner = _run(loud)
+    assert len(inner.frames) == len(loud)
+
+
+def test_speech_after_loud_opening_reaches_inner_vad():
+    frames = [_frame(2000, seed=i) for i in range(20)]
+    frames += [_frame(20, seed=i) for i in range(20, 40)]
+    speech = [_frame(1500, seed=i) for i in range(40, 60)]
+    inner = _run(frames + speech)
+    assert all(frame in inner.frames for frame in speech)
+
+
+def test_silence_is_gated():
+    inner = _run([_frame(20, seed=i) for i in range(200)])
+    assert inner.frames == []